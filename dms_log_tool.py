@@ -0,0 +1,206 @@
+"""
+DMS RPA — Log sorgulama ve retention aracı
+- dbo.Logs / dbo.ErrorLogs üzerinde filtreli hızlı sorgular
+- Zaman aralığına göre adım bazlı süre (latency) özetleri
+- Eski kayıtları küçük batch'lerle silen / arşivleyen retention işi
+
+Şema ve indeksler: sql/create_tables.sql
+
+Örnekler:
+    python dms_log_tool.py query --process "DMS Service Flow" --since 2026-10-01 --level ERROR
+    python dms_log_tool.py query --errors --run-id 3f2a...
+    python dms_log_tool.py latency --process "DMS Service Flow" --since 2026-10-01
+    python dms_log_tool.py purge --older-than-days 90 --archive
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+
+from dms_rpa_automation import get_sql_connection
+
+# -----------------------------------------------------------
+# 1. YARDIMCILAR
+# -----------------------------------------------------------
+
+def parse_date(value):
+    return datetime.fromisoformat(value)
+
+
+def time_range(args):
+    until = args.until or datetime.now()
+    since = args.since or until - timedelta(days=1)
+    return since, until
+
+
+def build_filters(args, date_column="LogDate"):
+    # (ProcessName, LogDate) indeksini kullanabilmek için önce süreç + tarih
+    since, until = time_range(args)
+    clauses, params = [], []
+    if args.process:
+        clauses.append("ProcessName = ?")
+        params.append(args.process)
+    clauses.append(f"{date_column} >= ? AND {date_column} < ?")
+    params.extend([since, until])
+    if getattr(args, "run_id", None):
+        clauses.append("RunId = ?")
+        params.append(args.run_id)
+    if getattr(args, "step", None):
+        clauses.append("StepName = ?")
+        params.append(args.step)
+    return " AND ".join(clauses), params
+
+
+def print_rows(columns, rows):
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join("" if v is None else str(v) for v in row))
+
+# -----------------------------------------------------------
+# 2. FİLTRELİ SORGU
+# -----------------------------------------------------------
+
+def query_logs(conn, args):
+    where, params = build_filters(args)
+    if args.errors:
+        columns = ["LogDate", "ProcessName", "StepName", "RunId", "ErrorMessage"]
+        table = "dbo.ErrorLogs"
+    else:
+        columns = ["LogDate", "Level", "ProcessName", "StepName", "DurationMs", "RunId", "Message"]
+        table = "dbo.Logs"
+        if args.level:
+            # Level kolonu logging seviyesinin sayısal değerini tutar (ör. "40")
+            level = logging.getLevelName(args.level.upper())
+            where += " AND Level = ?"
+            params.append(str(level if isinstance(level, int) else args.level))
+
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT TOP (?) {', '.join(columns)} FROM {table} WITH (NOLOCK) "
+        f"WHERE {where} ORDER BY LogDate DESC",
+        [args.limit] + params
+    )
+    print_rows(columns, cursor.fetchall())
+
+# -----------------------------------------------------------
+# 3. ADIM BAZLI LATENCY ÖZETİ
+# -----------------------------------------------------------
+
+def step_latency(conn, args):
+    # DurationMs yalnızca "Adım tamamlandı" satırlarında dolu; INFO filtresi
+    # eski (süreli hata satırı yazan) sürümlerin kayıtlarını da dışarıda bırakır
+    where, params = build_filters(args)
+    where += " AND Level = ?"
+    params.append(str(logging.INFO))
+    columns = ["StepName", "Count", "AvgMs", "MinMs", "MaxMs", "P95Ms"]
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT StepName, COUNT(*), AVG(CAST(DurationMs AS BIGINT)), MIN(DurationMs), "
+        "MAX(DurationMs), MAX(P95) "
+        "FROM (SELECT StepName, DurationMs, "
+        "      PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY DurationMs) "
+        "      OVER (PARTITION BY StepName) AS P95 "
+        f"      FROM dbo.Logs WITH (NOLOCK) WHERE {where} AND DurationMs IS NOT NULL) s "
+        "GROUP BY StepName ORDER BY AVG(CAST(DurationMs AS BIGINT)) DESC",
+        params
+    )
+    print_rows(columns, cursor.fetchall())
+
+# -----------------------------------------------------------
+# 4. RETENTION (BATCH SİLME / ARŞİVLEME)
+# -----------------------------------------------------------
+# Her batch ayrı transaction'da commit edilir; batch boyutu 5000'in altında
+# tutulduğu için SQL Server tablo kilidine (lock escalation) çıkmaz ve
+# robotların canlı log yazımı bloklanmaz.
+
+RETENTION_TABLES = {
+    "Logs": ("dbo.Logs", "dbo.LogsArchive",
+             "Id, LogDate, Level, ProcessName, Message, RunId, StepName, DurationMs"),
+    "ErrorLogs": ("dbo.ErrorLogs", "dbo.ErrorLogsArchive",
+                  "Id, ProcessName, ErrorMessage, LogDate, RunId, StepName"),
+}
+
+
+def purge_table(conn, table_key, cutoff, batch_size, archive, pause):
+    table, archive_table, columns = RETENTION_TABLES[table_key]
+    output = ""
+    if archive:
+        deleted = ", ".join(f"deleted.{c.strip()}" for c in columns.split(","))
+        output = f"OUTPUT {deleted} INTO {archive_table} ({columns}) "
+
+    total = 0
+    cursor = conn.cursor()
+    while True:
+        cursor.execute(
+            f"DELETE TOP (?) FROM {table} {output}WHERE LogDate < ?",
+            (batch_size, cutoff)
+        )
+        affected = cursor.rowcount
+        conn.commit()
+        total += max(affected, 0)
+        if affected < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    print(f"{table}: {total} kayıt {'arşivlendi' if archive else 'silindi'} (< {cutoff:%Y-%m-%d %H:%M})")
+    return total
+
+
+def purge_logs(conn, args):
+    cutoff = datetime.now() - timedelta(days=args.older_than_days)
+    tables = RETENTION_TABLES if args.table == "all" else [args.table]
+    for table_key in tables:
+        purge_table(conn, table_key, cutoff, args.batch_size, args.archive, args.pause)
+
+# -----------------------------------------------------------
+# 5. CLI
+# -----------------------------------------------------------
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="DMS RPA log sorgulama ve retention aracı")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_range(p):
+        p.add_argument("--process", help="ProcessName (akış adı)")
+        p.add_argument("--since", type=parse_date, help="Başlangıç (ISO tarih, varsayılan: son 24 saat)")
+        p.add_argument("--until", type=parse_date, help="Bitiş (ISO tarih, varsayılan: şimdi)")
+        p.add_argument("--step", help="StepName filtresi")
+
+    query = sub.add_parser("query", help="Filtreli log sorgusu")
+    add_range(query)
+    query.add_argument("--run-id", help="Tek bir koşunun logları")
+    query.add_argument("--level", help="Seviye filtresi (INFO, WARNING, ERROR ...)")
+    query.add_argument("--errors", action="store_true", help="dbo.ErrorLogs üzerinde sorgula")
+    query.add_argument("--limit", type=int, default=200)
+    query.set_defaults(func=query_logs)
+
+    latency = sub.add_parser("latency", help="Adım bazlı süre özeti")
+    add_range(latency)
+    latency.set_defaults(func=step_latency)
+
+    purge = sub.add_parser("purge", help="Eski logları batch'lerle sil / arşivle")
+    purge.add_argument("--older-than-days", type=int, required=True)
+    purge.add_argument("--table", choices=["Logs", "ErrorLogs", "all"], default="all")
+    purge.add_argument("--batch-size", type=int, default=4000)
+    purge.add_argument("--archive", action="store_true", help="Silmeden önce *Archive tablosuna taşı")
+    purge.add_argument("--pause", type=float, default=0.1, help="Batch'ler arası bekleme (sn)")
+    purge.set_defaults(func=purge_logs)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    conn = get_sql_connection()
+    if not conn:
+        raise SystemExit("SQL bağlantısı kurulamadı")
+    try:
+        args.func(conn, args)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,15 @@
 """
 DMS (Dealer Management System) RPA Otomasyonu
 Genişletilmiş Kod Dosyası — Full Pipeline
-- SQL Server loglama
+- SQL Server loglama (RunId / adım / süre kolonları, hatalar ErrorLogs'a)
 - UiPath Orchestrator API tetikleme (mock + gerçek endpoint yapısı)
-- BPMN 2.0 parser (extended)
+- BPMN 2.0 parser (extended) + BPMN 2.0 XML içe aktarma
 - Python ön-işleme modülleri
 - Config yönetimi
 - Retry mekanizması
 - JSON tabanlı süreç parametreleri
+- Idempotency (tekrarlanan iş kalemlerinin atlanması)
+- Yeniden kullanılabilir alt akışlar (call) ve foreach döngüleri
 
 Bu dosya gerçek RPA mimarisine yakın, genişletilmiş bir örnek projedir.
 """
@@ -17,7 +19,16 @@ import logging
 import requests
 import time
 import json
+import os
+import re
 import importlib
+import functools
+import hashlib
+import sqlite3
+import threading
+import uuid
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # -----------------------------------------------------------
@@ -48,17 +59,37 @@ def get_sql_connection():
         return None
 
 
-def write_sql_log(level, process, message):
+# Şema: sql/create_tables.sql (RunId, StepName, DurationMs kolonları ve
+# (ProcessName, LogDate) indeksleri). Mevcut veritabanlarında bu script bir kez
+# tekrar çalıştırılmalıdır; aksi halde SQL log yazılamaz (süreç durmaz, hata
+# dosya loguna düşer). Sorgu / retention için dms_log_tool.py.
+RUN_CONTEXT = {"run_id": None, "process": None}
+
+
+def write_sql_log(level, process, message, step=None, duration_ms=None):
     conn = get_sql_connection()
     if not conn:
         return
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO Logs (Level, ProcessName, Message, LogDate) VALUES (?, ?, ?, ?)",
-        (level, process, message, datetime.now())
-    )
-    conn.commit()
-    conn.close()
+    now = datetime.now()
+    run_id = RUN_CONTEXT["run_id"]
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO dbo.Logs (Level, ProcessName, Message, LogDate, RunId, StepName, DurationMs) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (level, process, message, now, run_id, step, duration_ms)
+        )
+        if level >= logging.ERROR:
+            cursor.execute(
+                "INSERT INTO dbo.ErrorLogs (ProcessName, ErrorMessage, LogDate, RunId, StepName) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (process, message, now, run_id, step)
+            )
+        conn.commit()
+    except Exception as e:
+        logging.error(f"SQL log yazılamadı (sql/create_tables.sql çalıştırıldı mı?): {e}")
+    finally:
+        conn.close()
 
 # -----------------------------------------------------------
 # 3. DOSYA + SQL + KONSOL LOGGING
@@ -69,10 +100,10 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-def log(level, process, message):
+def log(level, process, message, step=None, duration_ms=None):
     print(message)
     logging.log(level, f"{process} | {message}")
-    write_sql_log(level, process, message)
+    write_sql_log(level, process, message, step, duration_ms)
 
 # -----------------------------------------------------------
 # 4. RETRY MEKANİZMASI
@@ -88,22 +119,167 @@ def retry(func, retries=3, delay=2):
     raise Exception("Tüm retry denemeleri başarısız oldu.")
 
 # -----------------------------------------------------------
-# 5. BPMN 2.0 PARSER (GENİŞLETİLMİŞ)
+# 5. IDEMPOTENCY INDEX (Bloom filtre + kalıcı TTL deposu)
+# -----------------------------------------------------------
+# DMS aynı batch'i tekrar gönderdiğinde aynı UiPath job'ı (aynı bot + aynı
+# müşteri / iş emri parametreleri) tekrar çalışmasın diye her iş kalemi için
+# içerik anahtarı hesaplanır. Index yalnızca ana çalıştırmada (__main__)
+# oluşturulur; mock modda tamamlanan job'lar kaydedilmez.
+# Bloom filtre "kesin görülmedi" cevabını bellekte verir, "belki görüldü"
+# durumunda SQLite deposundaki TTL'li kayda bakılır.
+
+def content_key(kind, name, params):
+    payload = json.dumps(
+        {"kind": kind, "name": name, "params": params},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BloomFilter:
+    def __init__(self, size_bits=1 << 20, hash_count=5):
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self.bits = bytearray(size_bits // 8 + 1)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class IdempotencyIndex:
+    def __init__(self, db_path="idempotency.db", ttl_seconds=86400):
+        self.ttl_seconds = ttl_seconds
+        self.bloom = BloomFilter()
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.hits = 0
+        self.misses = 0
+
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS WorkItems (Key TEXT PRIMARY KEY, CreatedAt REAL NOT NULL)"
+        )
+        self.db.execute("DELETE FROM WorkItems WHERE CreatedAt < ?", (time.time() - ttl_seconds,))
+        self.db.commit()
+        for (key,) in self.db.execute("SELECT Key FROM WorkItems"):
+            self.bloom.add(key)
+
+    def _seen(self, key):
+        if key not in self.bloom:
+            return False
+        row = self.db.execute(
+            "SELECT 1 FROM WorkItems WHERE Key = ? AND CreatedAt >= ?",
+            (key, time.time() - self.ttl_seconds)
+        ).fetchone()
+        return row is not None
+
+    def claim(self, key):
+        # True → iş kalemi çalıştırılmalı; False → tekrar (atla).
+        # Aynı anahtar başka thread'de çalışıyorsa o deneme bitene kadar
+        # beklenir: başarılıysa atlanır, başarısızsa bu thread tekrar dener.
+        while True:
+            with self.lock:
+                if self._seen(key):
+                    self.hits += 1
+                    return False
+                running = self.in_flight.get(key)
+                if running is None:
+                    self.misses += 1
+                    self.in_flight[key] = threading.Event()
+                    return True
+            running.wait()
+
+    def complete(self, key):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO WorkItems (Key, CreatedAt) VALUES (?, ?)",
+                (key, time.time())
+            )
+            self.db.commit()
+            self.bloom.add(key)
+            self.in_flight.pop(key).set()
+
+    def release(self, key):
+        # başarısız iş kalemi tekrar denenebilsin diye kayıt yazılmaz
+        with self.lock:
+            self.in_flight.pop(key).set()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def create_idempotency_index():
+    settings = CONFIG.get("idempotency", {})
+    if not settings.get("enabled", True):
+        return None
+    return IdempotencyIndex(
+        db_path=settings.get("db_path", "idempotency.db"),
+        ttl_seconds=settings.get("ttl_seconds", 86400)
+    )
+
+IDEMPOTENCY = None
+
+# -----------------------------------------------------------
+# 6. BPMN 2.0 PARSER (GENİŞLETİLMİŞ)
 # -----------------------------------------------------------
 
 def load_bpmn(file_path):
+    if file_path.lower().endswith((".bpmn", ".xml")):
+        return load_bpmn_xml(file_path)
     with open(file_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def execute_bpmn_flow(flow):
-    steps = flow.get("steps", [])
-    for step in steps:
+def execute_bpmn_flow(flow, context=None):
+    # Tekrar kontrolü akış tanımı değil iş kalemi (UiPath job) seviyesinde
+    # yapılır: process_flow.json her çalıştırmada aynıdır.
+    # context: süreç değişkenleri (ör. DMS iş kalemi verisi), tüm adımlara geçer
+    RUN_CONTEXT["run_id"] = uuid.uuid4().hex
+    RUN_CONTEXT["process"] = flow.get("name")
+    return run_flow_steps(flow, context)
+
+
+def run_flow_steps(flow, context=None, subflows=None, chain=()):
+    # Özyinelemesiz çalıştırıcı: condition / call / foreach adımları Python
+    # call stack'i yerine açık bir yığına yeni çerçeve olarak eklenir.
+    # Her çerçeve (adım, bağlam) çiftleri üreten bir iterator taşır.
+    # Hatalı adım olursa False döner.
+    if subflows is None:
+        subflows = flow.get("subflows", {})
+    context = context or {}
+    process = RUN_CONTEXT["process"] or flow.get("name") or "Flow"
+    ok = True
+    stack = [(((s, context) for s in flow.get("steps", [])), chain, None, None)]
+
+    while stack:
+        pairs, frame_chain, parent_name, parent_started = stack[-1]
+        pair = next(pairs, None)
+        if pair is None:
+            stack.pop()
+            if parent_name:
+                log(logging.INFO, process, f"Adım tamamlandı: {parent_name}",
+                    parent_name, elapsed_ms(parent_started))
+            continue
+
+        step, ctx = pair
         name = step.get("name", "UnknownStep")
         action = step.get("action")
-        params = step.get("params", {})
+        params = {**ctx, **step.get("params", {})}
+        child = None
+        started = time.perf_counter()
 
-        log(logging.INFO, name, f"Adım başlatıldı: {name}")
+        log(logging.INFO, process, f"Adım başlatıldı: {name}", name)
 
         try:
             if action == "uipath":
@@ -116,15 +292,413 @@ def execute_bpmn_flow(flow):
                 time.sleep(params.get("seconds", 1))
 
             elif action == "condition":
-                run_conditional_flow(step)
+                branch = resolve_conditional_flow(step, params)
+                child = (((s, params) for s in branch.get("steps", [])), frame_chain)
+
+            elif action == "call":
+                sub_name, body = resolve_subflow(step, subflows, frame_chain, params)
+                # alt akış seçici parametre veri bağlamına (job parametreleri) taşınmaz
+                call_params = {k: v for k, v in params.items() if k != step.get("subflow_param")}
+                child = (((s, call_params) for s in body.get("steps", [])), extend_chain(frame_chain, sub_name))
+
+            elif action == "foreach":
+                child = run_foreach(step, params, subflows, frame_chain)
 
         except Exception as e:
-            log(logging.ERROR, name, f"Adım hatası: {e}")
+            ok = False
+            # süre yalnızca "tamamlandı" satırına yazılır (latency tek sayım)
+            log(logging.ERROR, process, f"Adım hatası: {e}", name)
+
+        if child:
+            stack.append((child[0], child[1], name, started))
+        else:
+            log(logging.INFO, process, f"Adım tamamlandı: {name}", name, elapsed_ms(started))
+
+    return ok
 
-        log(logging.INFO, name, f"Adım tamamlandı: {name}")
+
+def elapsed_ms(started):
+    return int((time.perf_counter() - started) * 1000)
+
+# -----------------------------------------------------------
+# 6.1 ALT AKIŞLAR (CALL ACTIVITY) + FOREACH
+# -----------------------------------------------------------
+# Alt akışlar akış dosyasının "subflows" alanında isimle tanımlanır:
+#   {"action": "call", "subflow": "MusteriKaydet", "params": {...}}
+#   {"action": "foreach", "items": "customers", "item_param": "customer",
+#    "subflow": "MusteriKaydet", "parallel": 4}
+# "items" bir liste ya da parametre adı olabilir; alt akış yerine
+# satır içi "flow" da verilebilir. "subflow_param" ile çağrılacak alt akışın
+# adı parametreden okunur (ör. paralel gateway dalları); bu parametre alt akışa
+# geçirilmez.
+
+def resolve_subflow(step, subflows, chain, params):
+    sub_name = step.get("subflow")
+    if sub_name is None and "subflow_param" in step:
+        sub_name = params.get(step["subflow_param"])
+    if sub_name is None:
+        # satır içi gövde: döngü kontrol zincirine girmez
+        return None, step.get("flow", {})
+    if sub_name in chain:
+        raise Exception(f"Döngüsel alt akış çağrısı: {' → '.join(chain + (sub_name,))}")
+    if sub_name not in subflows:
+        raise Exception(f"Alt akış bulunamadı: {sub_name}")
+    return sub_name, subflows[sub_name]
+
+
+def extend_chain(chain, sub_name):
+    return chain if sub_name is None else chain + (sub_name,)
+
+
+def run_foreach(step, params, subflows, chain):
+    items = step.get("items", [])
+    base = params
+    if isinstance(items, str):
+        # döngü listesi gövde adımlarına (ve job içerik anahtarına) taşınmasın
+        base = {k: v for k, v in params.items() if k != items}
+        items = params.get(items, [])
+    item_param = step.get("item_param", "item")
+    sub_name, body = resolve_subflow(step, subflows, chain, params)
+    body_steps = body.get("steps", [])
+    parallel = int(step.get("parallel", 1))
+
+    log(logging.INFO, "Foreach", f"{len(items)} eleman işlenecek ({sub_name or 'inline'}, parallel={parallel})")
+
+    if parallel <= 1:
+        pairs = ((s, {**base, item_param: item}) for item in items for s in body_steps)
+        return pairs, extend_chain(chain, sub_name)
+
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        futures = [
+            pool.submit(run_flow_steps, body, {**base, item_param: item}, subflows, extend_chain(chain, sub_name))
+            for item in items
+        ]
+        failed = sum(not future.result() for future in futures)
+    if failed:
+        raise Exception(f"{failed}/{len(items)} foreach elemanında hatalı adım var")
+    return None
 
 # -----------------------------------------------------------
-# 6. UiPath Orchestrator API (gerçek endpoint yapısı + mock)
+# 6.2 BPMN 2.0 XML İÇE AKTARMA (iterparse + hash cache)
+# -----------------------------------------------------------
+# Analistlerin modellediği .bpmn dosyaları iç akış modeline derlenir:
+#   serviceTask            → uipath   (botName özniteliği ya da task adı)
+#   scriptTask             → python   (module özniteliği ya da task adı)
+#   exclusiveGateway       → condition (conditionExpression / default akış)
+#   parallelGateway        → foreach  (her dal bir alt akış, parallel=dal sayısı)
+#   timer catch event      → wait     (ISO 8601 timeDuration, ör. PT30S)
+# inclusiveGateway, subProcess, boundaryEvent, timer olmayan catch event'ler
+# (message / signal) ve timeDate / timeCycle timer'ları desteklenmez; hata verir.
+# Süreç değişkenleri: gateway koşulları (${amount > 100} → amount > 100) adımın
+# bağlamında değerlendirilir. Bağlam execute_bpmn_flow(flow, context) ile verilen
+# iş kalemi verisi + extensionElements inputParameter değerlerinden oluşur;
+# modülün global'lerine düşen isimler süreç değişkeni sayılmaz.
+# Birden fazla process (collaboration) varsa isExecutable="true" olan seçilir.
+# XML iterparse ile akıtılır; işlenen elemanlar hemen temizlendiği için büyük
+# diyagramlarda (özellikle BPMNDI şekilleri) bellek sabit kalır. Derlenen akış
+# dosya hash'ine göre bpmn_cache/ altına yazılır, aynı dosya tekrar parse edilmez.
+
+BPMN_CACHE_DIR = "bpmn_cache"
+BPMN_COMPILER_VERSION = 3
+BPMN_TASKS = {"task", "serviceTask", "scriptTask", "sendTask", "receiveTask",
+              "userTask", "manualTask", "businessRuleTask"}
+BPMN_NODES = BPMN_TASKS | {"startEvent", "endEvent", "intermediateCatchEvent",
+                           "intermediateThrowEvent", "exclusiveGateway",
+                           "parallelGateway"}
+BPMN_UNSUPPORTED = {"inclusiveGateway", "complexGateway", "eventBasedGateway",
+                    "subProcess", "transaction", "callActivity", "boundaryEvent"}
+
+# paralel gateway dal seçicisi; gerçek "branch" (bayi şubesi) parametresini ezmez
+BPMN_BRANCH_PARAM = "__bpmn_branch"
+
+_bpmn_memory_cache = {}
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _attr(elem, name, default=None):
+    # namespace'li (camunda:module, dms:botName ...) öznitelikleri de kabul et
+    for key, value in elem.attrib.items():
+        if _local(key) == name:
+            return value
+    return default
+
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        return text
+
+
+def parse_iso_duration(value):
+    match = re.fullmatch(
+        r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?",
+        (value or "").strip()
+    )
+    if not match:
+        raise Exception(f"Desteklenmeyen timer süresi: {value}")
+    days, hours, minutes, seconds = match.groups()
+    return (int(days or 0) * 86400 + int(hours or 0) * 3600
+            + int(minutes or 0) * 60 + float(seconds or 0))
+
+
+def _read_bpmn_node(elem):
+    kind = _local(elem.tag)
+    node = {"id": elem.get("id"), "kind": kind, "name": elem.get("name") or elem.get("id"),
+            "default": elem.get("default"), "params": {}}
+    if kind in ("serviceTask", "task", "sendTask"):
+        node["bot_name"] = _attr(elem, "botName", node["name"])
+    if kind == "scriptTask":
+        node["module"] = _attr(elem, "module", node["name"])
+
+    for child in elem.iter():
+        child_kind = _local(child.tag)
+        if child_kind in ("inputParameter", "property", "param") and child.get("name"):
+            node["params"][child.get("name")] = _parse_value(child.get("value", child.text))
+        elif child_kind == "timerEventDefinition":
+            node["timer"] = True
+        elif child_kind == "timeDuration":
+            node["seconds"] = parse_iso_duration(child.text)
+        elif child_kind in ("timeDate", "timeCycle"):
+            raise Exception(f"Desteklenmeyen timer tipi ({child_kind}): {node['id']}")
+    return node
+
+
+def parse_bpmn_xml(file_path):
+    processes = []
+    current = None
+    stack = []
+
+    for event, elem in ET.iterparse(file_path, events=("start", "end")):
+        kind = _local(elem.tag)
+        if event == "start":
+            stack.append(elem)
+            if kind == "process":
+                current = {
+                    "id": elem.get("id"),
+                    "name": elem.get("name") or elem.get("id"),
+                    "executable": elem.get("isExecutable", "").lower() == "true",
+                    "nodes": {}, "flows": {}, "unsupported": [],
+                }
+                processes.append(current)
+            continue
+
+        stack.pop()
+        parent = stack[-1] if stack else None
+        parent_is_process = parent is not None and _local(parent.tag) == "process"
+        in_process = current is not None
+
+        if kind == "process":
+            current = None
+        elif in_process and parent_is_process:
+            if kind == "sequenceFlow":
+                condition = None
+                for child in elem:
+                    if _local(child.tag) == "conditionExpression":
+                        condition = (child.text or "").strip()
+                current["flows"][elem.get("id")] = {
+                    "source": elem.get("sourceRef"),
+                    "target": elem.get("targetRef"),
+                    "condition": condition,
+                }
+            elif kind in BPMN_NODES:
+                # hata yalnızca bu process çalıştırılmak üzere seçilirse raise edilir
+                try:
+                    current["nodes"][elem.get("id")] = _read_bpmn_node(elem)
+                except Exception as e:
+                    current["unsupported"].append(str(e))
+            elif kind in BPMN_UNSUPPORTED:
+                current["unsupported"].append(f"{kind} desteklenmiyor: {elem.get('id')}")
+
+        # process dışındaki (BPMNDI vb.) elemanlar ve işlenmiş düğümler temizlenir
+        if not in_process or parent_is_process:
+            elem.clear()
+            if parent is not None:
+                parent.remove(elem)
+
+    process = select_bpmn_process(processes, file_path)
+    if process["unsupported"]:
+        raise Exception("; ".join(process["unsupported"]))
+    return process["name"], process["nodes"], process["flows"]
+
+
+def select_bpmn_process(processes, file_path):
+    executable = [p for p in processes if p["executable"]]
+    if len(executable) == 1:
+        return executable[0]
+    if not executable and len(processes) == 1:
+        return processes[0]
+    if not processes or not any(p["nodes"] for p in processes):
+        raise Exception(f"BPMN process bulunamadı: {file_path}")
+    candidates = executable or processes
+    raise Exception(
+        "Çalıştırılacak BPMN process belirsiz (isExecutable=\"true\" tek process olmalı): "
+        + ", ".join(p["id"] for p in candidates)
+    )
+
+
+class BpmnCompiler:
+    def __init__(self, nodes, flows):
+        self.nodes = nodes
+        self.outgoing = {node_id: [] for node_id in nodes}
+        for flow_id, flow in flows.items():
+            self.outgoing.setdefault(flow["source"], []).append(dict(flow, id=flow_id))
+        self.subflows = {}
+
+    def compile(self, process_name):
+        starts = [n for n in self.nodes.values() if n["kind"] == "startEvent"]
+        if len(starts) != 1:
+            raise Exception(f"BPMN akışında tek startEvent olmalı, bulunan: {len(starts)}")
+        steps, _ = self.compile_path(starts[0]["id"], None, ())
+        flow = {"name": process_name, "steps": steps}
+        if self.subflows:
+            flow["subflows"] = self.subflows
+        return flow
+
+    def _next(self, node_id):
+        out = self.outgoing.get(node_id, [])
+        if len(out) > 1:
+            raise Exception(f"Birden fazla çıkışı olan düğüm gateway olmalı: {node_id}")
+        return out[0]["target"] if out else None
+
+    def _reachable(self, node_id):
+        seen, order, todo = set(), [], [node_id]
+        while todo:
+            current = todo.pop(0)
+            if current in seen:
+                continue
+            seen.add(current)
+            order.append(current)
+            todo.extend(f["target"] for f in self.outgoing.get(current, []))
+        return order
+
+    def find_join(self, targets):
+        # Tüm dallardan erişilebilen, ilk dala en yakın düğüm birleşim noktasıdır
+        reach = [set(self._reachable(t)) for t in targets[1:]]
+        for candidate in self._reachable(targets[0]):
+            if all(candidate in r for r in reach):
+                return candidate
+        return None
+
+    def compile_path(self, node_id, stop_at, path):
+        steps = []
+        while node_id is not None and node_id != stop_at:
+            if node_id in path:
+                raise Exception(f"BPMN döngüleri desteklenmiyor: {node_id}")
+            if node_id not in self.nodes:
+                raise Exception(f"Tanımsız BPMN düğümü: {node_id}")
+            path = path + (node_id,)
+            node = self.nodes[node_id]
+            kind = node["kind"]
+            out = self.outgoing.get(node_id, [])
+
+            if kind in ("exclusiveGateway", "parallelGateway") and len(out) > 1:
+                join = self.find_join([f["target"] for f in out])
+                if kind == "parallelGateway":
+                    steps.append(self.compile_parallel(node, out, join, path))
+                else:
+                    steps.append(self.compile_exclusive(node, out, join, path))
+                node_id = join
+                continue
+
+            if kind == "endEvent":
+                break
+            step = self.compile_node(node)
+            if step:
+                steps.append(step)
+            node_id = self._next(node_id)
+        return steps, node_id
+
+    def compile_node(self, node):
+        kind = node["kind"]
+        if kind == "serviceTask" or (kind in ("task", "sendTask") and node["params"]):
+            return {"name": node["name"], "action": "uipath",
+                    "bot_name": node["bot_name"], "params": node["params"]}
+        if kind == "scriptTask":
+            return {"name": node["name"], "action": "python",
+                    "module": node["module"], "params": node["params"]}
+        if kind == "intermediateCatchEvent":
+            if not node.get("timer"):
+                raise Exception(f"Timer olmayan catch event desteklenmiyor: {node['id']}")
+            if "seconds" not in node:
+                raise Exception(f"Timer süresi (timeDuration) eksik: {node['id']}")
+            return {"name": node["name"], "action": "wait",
+                    "params": {"seconds": node["seconds"]}}
+        if kind in BPMN_TASKS:
+            log(logging.WARNING, "BPMN", f"Eşlenmeyen task atlandı: {node['name']} ({kind})")
+        return None
+
+    def compile_exclusive(self, node, out, join, path):
+        default = [f for f in out if f["id"] == node["default"] or not f["condition"]]
+        conditional = [f for f in out if f not in default]
+        if not conditional or len(default) > 1:
+            raise Exception(f"Gateway koşulları eksik: {node['id']}")
+
+        else_flow = {"steps": self.compile_path(default[0]["target"], join, path)[0]} if default else {"steps": []}
+        for i, flow in enumerate(reversed(conditional)):
+            condition = re.sub(r"^\$\{(.*)\}$", r"\1", flow["condition"], flags=re.S).strip()
+            else_flow = {"steps": [{
+                "name": node["name"] if i == len(conditional) - 1 else f"{node['name']} ({flow['id']})",
+                "action": "condition",
+                "condition": condition,
+                "true_flow": {"steps": self.compile_path(flow["target"], join, path)[0]},
+                "false_flow": else_flow,
+            }]}
+        return else_flow["steps"][0]
+
+    def compile_parallel(self, node, out, join, path):
+        branches = []
+        for i, flow in enumerate(out, 1):
+            sub_name = f"{node['id']}_{i}"
+            self.subflows[sub_name] = {"steps": self.compile_path(flow["target"], join, path)[0]}
+            branches.append(sub_name)
+        return {
+            "name": node["name"],
+            "action": "foreach",
+            "items": branches,
+            "item_param": BPMN_BRANCH_PARAM,
+            "parallel": len(branches),
+            "flow": {"steps": [{"name": f"{node['name']} dal", "action": "call",
+                                "subflow_param": BPMN_BRANCH_PARAM}]},
+        }
+
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_bpmn_xml(file_path):
+    file_hash = f"{file_sha256(file_path)}-v{BPMN_COMPILER_VERSION}"
+    if file_hash in _bpmn_memory_cache:
+        return _bpmn_memory_cache[file_hash]
+
+    cache_file = os.path.join(BPMN_CACHE_DIR, f"{file_hash}.json")
+    if os.path.exists(cache_file):
+        with open(cache_file, "r", encoding="utf-8") as f:
+            flow = json.load(f)
+        log(logging.INFO, "BPMN", f"Derlenmiş akış cache'ten yüklendi: {file_path}")
+    else:
+        process_name, nodes, flows = parse_bpmn_xml(file_path)
+        flow = BpmnCompiler(nodes, flows).compile(process_name)
+        os.makedirs(BPMN_CACHE_DIR, exist_ok=True)
+        tmp_file = cache_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(flow, f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+        log(logging.INFO, "BPMN", f"BPMN XML derlendi: {file_path} ({len(nodes)} düğüm)")
+
+    _bpmn_memory_cache[file_hash] = flow
+    return flow
+
+# -----------------------------------------------------------
+# 7. UiPath Orchestrator API (gerçek endpoint yapısı + mock)
 # -----------------------------------------------------------
 
 def orchestrator_auth():
@@ -134,6 +708,25 @@ def orchestrator_auth():
 
 
 def trigger_uipath_bot(bot_name, params):
+    if IDEMPOTENCY is None or CONFIG['uipath']['mock']:
+        return start_uipath_job(bot_name, params)
+
+    key = content_key("uipath", bot_name, params)
+    if not IDEMPOTENCY.claim(key):
+        log(logging.INFO, "Idempotency", f"Tekrarlanan UiPath job atlandı: {bot_name}")
+        return True
+
+    try:
+        result = start_uipath_job(bot_name, params)
+    except BaseException:
+        IDEMPOTENCY.release(key)
+        raise
+
+    IDEMPOTENCY.complete(key)
+    return result
+
+
+def start_uipath_job(bot_name, params):
     url = CONFIG['uipath']['orchestrator_url'] + "/jobs/start"
     payload = {
         "bot": bot_name,
@@ -149,11 +742,12 @@ def trigger_uipath_bot(bot_name, params):
     response = requests.post(url, json=payload, headers=orchestrator_auth())
     if response.status_code == 200:
         log(logging.INFO, "UiPath", f"Bot tetiklendi: {bot_name}")
+        return True
     else:
         raise Exception(f"UiPath API hatası: {response.text}")
 
 # -----------------------------------------------------------
-# 7. PYTHON ÖN-İŞLEME MODÜLLERİ (dinamik yükleme)
+# 8. PYTHON ÖN-İŞLEME MODÜLLERİ (dinamik yükleme)
 # -----------------------------------------------------------
 
 def run_python_module(module_name, params):
@@ -166,30 +760,38 @@ def run_python_module(module_name, params):
         raise Exception(f"Modülde 'run' fonksiyonu yok: {module_name}")
 
 # -----------------------------------------------------------
-# 8. KOŞULLU BPMN ADIMI
+# 9. KOŞULLU BPMN ADIMI
 # -----------------------------------------------------------
 
-def run_conditional_flow(step):
+@functools.lru_cache(maxsize=256)
+def compile_condition(condition):
+    return compile(condition, "<condition>", "eval")
+
+
+def resolve_conditional_flow(step, context):
     condition = step.get("condition")
-    true_flow = step.get("true_flow")
-    false_flow = step.get("false_flow")
 
-    if eval(condition):
+    if eval(compile_condition(condition), globals(), dict(context)):
         log(logging.INFO, "Condition", "Şart sağlandı → True Flow")
-        execute_bpmn_flow(true_flow)
+        return step.get("true_flow") or {}
     else:
         log(logging.INFO, "Condition", "Şart sağlanmadı → False Flow")
-        execute_bpmn_flow(false_flow)
+        return step.get("false_flow") or {}
 
 # -----------------------------------------------------------
-# 9. ANA ÇALIŞTIRMA
+# 10. ANA ÇALIŞTIRMA
 # -----------------------------------------------------------
 if __name__ == "__main__":
     try:
         log(logging.INFO, "Main", "DMS RPA Otomasyon Başlatıldı")
+        IDEMPOTENCY = create_idempotency_index()
         bpmn_flow = load_bpmn("process_flow.json")
-        execute_bpmn_flow(bpmn_flow)
-        log(logging.INFO, "Main", "Tüm süreç tamamlandı")
+        if execute_bpmn_flow(bpmn_flow):
+            log(logging.INFO, "Main", "Tüm süreç tamamlandı")
+        else:
+            log(logging.WARNING, "Main", "Süreç hatalı adımlarla tamamlandı")
+        if IDEMPOTENCY is not None:
+            log(logging.INFO, "Idempotency", f"Tekrar kontrolü: {IDEMPOTENCY.stats()}")
 
     except Exception as e:
         log(logging.ERROR, "Main", f"Kritik hata: {e}")
@@ -0,0 +1,72 @@
+-- SQL Server: Log tabloları
+-- Tekrar çalıştırılabilir: mevcut kurulumlarda eksik kolon / indeksleri ekler.
+IF OBJECT_ID('dbo.Logs', 'U') IS NULL
+CREATE TABLE dbo.Logs (
+    Id INT IDENTITY(1,1) PRIMARY KEY,
+    LogDate DATETIME NOT NULL DEFAULT GETDATE(),
+    Level NVARCHAR(20),
+    ProcessName NVARCHAR(200),
+    Message NVARCHAR(MAX)
+);
+GO
+
+IF OBJECT_ID('dbo.ErrorLogs', 'U') IS NULL
+CREATE TABLE dbo.ErrorLogs (
+    Id INT IDENTITY(1,1) PRIMARY KEY,
+    ProcessName NVARCHAR(200),
+    ErrorMessage NVARCHAR(MAX),
+    LogDate DATETIME NOT NULL DEFAULT GETDATE()
+);
+GO
+
+-- Koşu / adım / süre bilgisi
+IF COL_LENGTH('dbo.Logs', 'RunId') IS NULL
+    ALTER TABLE dbo.Logs ADD RunId CHAR(32) NULL, StepName NVARCHAR(200) NULL, DurationMs INT NULL;
+IF COL_LENGTH('dbo.ErrorLogs', 'RunId') IS NULL
+    ALTER TABLE dbo.ErrorLogs ADD RunId CHAR(32) NULL, StepName NVARCHAR(200) NULL;
+GO
+
+-- Süreç + zaman aralığı sorguları (dms_log_tool.py query / latency)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Logs_ProcessName_LogDate')
+    CREATE INDEX IX_Logs_ProcessName_LogDate ON dbo.Logs (ProcessName, LogDate)
+        INCLUDE (Level, RunId, StepName, DurationMs);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Logs_RunId')
+    CREATE INDEX IX_Logs_RunId ON dbo.Logs (RunId) WHERE RunId IS NOT NULL;
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ErrorLogs_ProcessName_LogDate')
+    CREATE INDEX IX_ErrorLogs_ProcessName_LogDate ON dbo.ErrorLogs (ProcessName, LogDate)
+        INCLUDE (RunId, StepName);
+GO
+
+-- Retention (dms_log_tool.py purge): LogDate sıralı küçük batch'ler.
+-- Tablolar ileride LogDate üzerinden aylık partition'a alınırsa bu indeksler
+-- aynı partition şemasına hizalanmalı; o durumda eski partition'lar
+-- SWITCH OUT / TRUNCATE ... WITH (PARTITIONS (...)) ile de atılabilir.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Logs_LogDate')
+    CREATE INDEX IX_Logs_LogDate ON dbo.Logs (LogDate);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_ErrorLogs_LogDate')
+    CREATE INDEX IX_ErrorLogs_LogDate ON dbo.ErrorLogs (LogDate);
+GO
+
+-- Arşiv tabloları (purge --archive)
+IF OBJECT_ID('dbo.LogsArchive', 'U') IS NULL
+CREATE TABLE dbo.LogsArchive (
+    Id INT PRIMARY KEY,
+    LogDate DATETIME NOT NULL,
+    Level NVARCHAR(20),
+    ProcessName NVARCHAR(200),
+    Message NVARCHAR(MAX),
+    RunId CHAR(32) NULL,
+    StepName NVARCHAR(200) NULL,
+    DurationMs INT NULL
+);
+
+IF OBJECT_ID('dbo.ErrorLogsArchive', 'U') IS NULL
+CREATE TABLE dbo.ErrorLogsArchive (
+    Id INT PRIMARY KEY,
+    ProcessName NVARCHAR(200),
+    ErrorMessage NVARCHAR(MAX),
+    LogDate DATETIME NOT NULL,
+    RunId CHAR(32) NULL,
+    StepName NVARCHAR(200) NULL
+);
+GO
@@ -0,0 +1,43 @@
+import importlib
+import json
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# SQL bağlantısı ve Orchestrator çağrıları testlerde monkeypatch'lenir;
+# sürücüsü (unixODBC) olmayan CI ortamlarında import için boş modül yeterli.
+for _name in ("pyodbc", "requests"):
+    try:
+        importlib.import_module(_name)
+    except ImportError:
+        sys.modules[_name] = types.ModuleType(_name)
+
+TEST_CONFIG = {
+    "sql": {"server": "localhost", "database": "DMS_LOGS"},
+    "uipath": {"mock": True, "orchestrator_url": "https://platform.uipath.com", "token": "test"},
+}
+
+
+@pytest.fixture
+def rpa(tmp_path, monkeypatch):
+    # dms_rpa_automation import sırasında cwd'deki config.json'u okur
+    (tmp_path / "config.json").write_text(json.dumps(TEST_CONFIG), encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(ROOT))
+    sys.modules.pop("dms_rpa_automation", None)
+    module = importlib.import_module("dms_rpa_automation")
+    monkeypatch.setattr(module, "get_sql_connection", lambda: None)
+    monkeypatch.setattr(module, "BPMN_CACHE_DIR", str(tmp_path / "bpmn_cache"))
+    return module
+
+
+@pytest.fixture
+def uipath_calls(rpa, monkeypatch):
+    calls = []
+    monkeypatch.setattr(rpa, "start_uipath_job", lambda bot, params: calls.append((bot, params)) or True)
+    return calls
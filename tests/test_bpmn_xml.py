@@ -0,0 +1,119 @@
+import shutil
+
+import pytest
+
+from conftest import FIXTURES
+
+PROCESS_HEADER = '<bpmn:definitions xmlns:bpmn="http://www.omg.org/spec/BPMN/20100524/MODEL">'
+
+
+def write_process(tmp_path, body, attrs='id="P" isExecutable="true"'):
+    path = tmp_path / "flow.bpmn"
+    path.write_text(f'{PROCESS_HEADER}<bpmn:process {attrs}>{body}</bpmn:process></bpmn:definitions>',
+                    encoding="utf-8")
+    return str(path)
+
+
+def test_service_flow_compiles_to_internal_actions(rpa):
+    flow = rpa.load_bpmn(str(FIXTURES / "service_flow.bpmn"))
+
+    assert flow["name"] == "DMS Service Flow"
+    preprocess, amount, split, wait = flow["steps"]
+    assert preprocess == {"name": "Preprocess Customer", "action": "python", "module": "preprocess_customer",
+                          "params": {"customer": {"name": "ali", "phone": "+90 (555) 123 45 67"}}}
+    assert amount["action"] == "condition"
+    assert amount["condition"] == "amount > 100"
+    assert amount["true_flow"]["steps"][0]["bot_name"] == "ApproveServiceJob"
+    assert amount["false_flow"] == {"steps": []}
+    assert split["action"] == "foreach"
+    assert split["parallel"] == 2
+    assert [flow["subflows"][b]["steps"][0]["bot_name"] for b in split["items"]] == [
+        "CreateServiceJob", "NotifyCustomerJob"]
+    assert wait == {"name": "Wait Short", "action": "wait", "params": {"seconds": 0.01}}
+
+
+def test_compiled_flow_runs_all_branches_with_exact_params(rpa, uipath_calls, monkeypatch):
+    monkeypatch.setattr(rpa, "run_python_module", lambda module, params: None)
+    flow = rpa.load_bpmn(str(FIXTURES / "service_flow.bpmn"))
+
+    assert rpa.run_flow_steps(flow, {"amount": 500, "branch": "Kadıköy"}) is True
+    assert sorted(uipath_calls, key=lambda c: c[0]) == [
+        ("ApproveServiceJob", {"amount": 500, "branch": "Kadıköy"}),
+        ("CreateServiceJob", {"amount": 500, "branch": "Kadıköy"}),
+        ("NotifyCustomerJob", {"amount": 500, "branch": "Kadıköy"}),
+    ]
+
+
+def test_gateway_condition_without_process_variable_fails(rpa, uipath_calls, monkeypatch):
+    monkeypatch.setattr(rpa, "run_python_module", lambda module, params: None)
+    flow = rpa.load_bpmn(str(FIXTURES / "service_flow.bpmn"))
+
+    assert rpa.run_flow_steps(flow) is False
+    assert "ApproveServiceJob" not in [bot for bot, _ in uipath_calls]
+
+
+def test_compiled_flow_is_cached_by_file_hash(rpa, tmp_path, monkeypatch):
+    path = tmp_path / "copy.bpmn"
+    shutil.copy(FIXTURES / "service_flow.bpmn", path)
+    first = rpa.load_bpmn(str(path))
+
+    rpa._bpmn_memory_cache.clear()
+    monkeypatch.setattr(rpa, "parse_bpmn_xml", lambda p: pytest.fail("XML tekrar parse edildi"))
+    assert rpa.load_bpmn(str(path)) == first
+
+
+def test_inclusive_gateway_is_rejected(rpa, tmp_path):
+    path = write_process(tmp_path, '<bpmn:startEvent id="s"/><bpmn:inclusiveGateway id="g"/>')
+
+    with pytest.raises(Exception, match="inclusiveGateway desteklenmiyor"):
+        rpa.load_bpmn(path)
+
+
+@pytest.mark.parametrize("timer", ["timeDate", "timeCycle"])
+def test_non_duration_timer_is_rejected(rpa, tmp_path, timer):
+    path = write_process(tmp_path, (
+        '<bpmn:startEvent id="s"/><bpmn:sequenceFlow id="f" sourceRef="s" targetRef="t"/>'
+        f'<bpmn:intermediateCatchEvent id="t"><bpmn:timerEventDefinition><bpmn:{timer}>R3/PT1M</bpmn:{timer}>'
+        '</bpmn:timerEventDefinition></bpmn:intermediateCatchEvent>'
+    ))
+
+    with pytest.raises(Exception, match=timer):
+        rpa.load_bpmn(path)
+
+
+def test_ambiguous_process_choice_fails(rpa, tmp_path):
+    path = tmp_path / "two.bpmn"
+    path.write_text(
+        f'{PROCESS_HEADER}<bpmn:process id="A"><bpmn:startEvent id="s1"/></bpmn:process>'
+        '<bpmn:process id="B"><bpmn:startEvent id="s2"/></bpmn:process></bpmn:definitions>',
+        encoding="utf-8"
+    )
+
+    with pytest.raises(Exception, match="belirsiz"):
+        rpa.load_bpmn(str(path))
+
+
+def test_boundary_event_is_rejected(rpa, tmp_path):
+    path = write_process(tmp_path, (
+        '<bpmn:startEvent id="s"/><bpmn:sequenceFlow id="f1" sourceRef="s" targetRef="Job"/>'
+        '<bpmn:serviceTask id="Job" name="Job"/><bpmn:sequenceFlow id="f2" sourceRef="Job" targetRef="e"/>'
+        '<bpmn:endEvent id="e"/>'
+        '<bpmn:boundaryEvent id="Timeout" attachedToRef="Job"><bpmn:timerEventDefinition>'
+        '<bpmn:timeDuration>PT5M</bpmn:timeDuration></bpmn:timerEventDefinition></bpmn:boundaryEvent>'
+        '<bpmn:sequenceFlow id="f3" sourceRef="Timeout" targetRef="Escalate"/>'
+        '<bpmn:serviceTask id="Escalate" name="Escalate"/>'
+    ))
+
+    with pytest.raises(Exception, match="boundaryEvent desteklenmiyor"):
+        rpa.load_bpmn(path)
+
+
+def test_message_catch_event_is_rejected(rpa, tmp_path):
+    path = write_process(tmp_path, (
+        '<bpmn:startEvent id="s"/><bpmn:sequenceFlow id="f1" sourceRef="s" targetRef="m"/>'
+        '<bpmn:intermediateCatchEvent id="m"><bpmn:messageEventDefinition/></bpmn:intermediateCatchEvent>'
+        '<bpmn:sequenceFlow id="f2" sourceRef="m" targetRef="e"/><bpmn:endEvent id="e"/>'
+    ))
+
+    with pytest.raises(Exception, match="Timer olmayan catch event"):
+        rpa.load_bpmn(path)
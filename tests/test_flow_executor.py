@@ -0,0 +1,78 @@
+import pytest
+
+SUBFLOWS = {"Register": {"steps": [{"name": "job", "action": "uipath", "bot_name": "B"}]}}
+
+
+@pytest.mark.parametrize("parallel", [1, "3"])
+def test_foreach_passes_only_the_item(rpa, uipath_calls, parallel):
+    flow = {"name": "F", "subflows": SUBFLOWS, "steps": [{
+        "name": "each", "action": "foreach", "items": "customers", "item_param": "c",
+        "subflow": "Register", "parallel": parallel,
+        "params": {"customers": [1, 2, 3], "region": "TR"},
+    }]}
+
+    assert rpa.execute_bpmn_flow(flow) is True
+    assert sorted(uipath_calls, key=lambda c: c[1]["c"]) == [
+        ("B", {"region": "TR", "c": 1}),
+        ("B", {"region": "TR", "c": 2}),
+        ("B", {"region": "TR", "c": 3}),
+    ]
+
+
+def test_parallel_foreach_reports_failed_items(rpa, monkeypatch):
+    def fail_on_two(bot, params):
+        if params["c"] == 2:
+            raise Exception("bot hatası")
+
+    monkeypatch.setattr(rpa, "start_uipath_job", fail_on_two)
+    flow = {"name": "F", "subflows": SUBFLOWS, "steps": [{
+        "name": "each", "action": "foreach", "items": [1, 2, 3], "item_param": "c",
+        "subflow": "Register", "parallel": 2,
+    }]}
+
+    assert rpa.execute_bpmn_flow(flow) is False
+
+
+def test_deep_condition_nesting_runs_without_recursion(rpa, uipath_calls):
+    flow = {"steps": [{"name": "leaf", "action": "uipath", "bot_name": "Leaf"}]}
+    for i in range(3000):
+        flow = {"steps": [{"name": f"c{i}", "action": "condition", "condition": "x > 0", "true_flow": flow}]}
+
+    assert rpa.run_flow_steps(flow, {"x": 1}) is True
+    assert uipath_calls == [("Leaf", {"x": 1})]
+
+
+def test_call_passes_params_to_subflow(rpa, uipath_calls):
+    flow = {"name": "F", "subflows": SUBFLOWS, "steps": [
+        {"name": "call", "action": "call", "subflow": "Register", "params": {"c": 7}},
+    ]}
+
+    assert rpa.execute_bpmn_flow(flow) is True
+    assert uipath_calls == [("B", {"c": 7})]
+
+
+def test_cyclic_subflow_call_fails_the_step(rpa):
+    flow = {"name": "F", "subflows": {"Loop": {"steps": [{"name": "again", "action": "call", "subflow": "Loop"}]}},
+            "steps": [{"name": "start", "action": "call", "subflow": "Loop"}]}
+
+    assert rpa.execute_bpmn_flow(flow) is False
+
+
+def test_condition_uses_its_own_params(rpa, uipath_calls):
+    flow = {"name": "F", "steps": [{
+        "name": "check", "action": "condition", "condition": "amount > 100", "params": {"amount": 500},
+        "true_flow": {"steps": [{"name": "job", "action": "uipath", "bot_name": "Approve"}]},
+    }]}
+
+    assert rpa.execute_bpmn_flow(flow) is True
+    assert uipath_calls == [("Approve", {"amount": 500})]
+
+
+def test_inline_body_name_is_not_a_cycle(rpa, uipath_calls):
+    flow = {"name": "F", "subflows": {"Register": SUBFLOWS["Register"]}, "steps": [{
+        "name": "Register", "action": "foreach", "items": [1], "item_param": "c",
+        "flow": {"steps": [{"name": "call", "action": "call", "subflow": "Register"}]},
+    }]}
+
+    assert rpa.execute_bpmn_flow(flow) is True
+    assert uipath_calls == [("B", {"c": 1})]
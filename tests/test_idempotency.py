@@ -0,0 +1,107 @@
+import time
+
+
+def test_duplicate_job_is_skipped(rpa, uipath_calls, tmp_path):
+    rpa.CONFIG["uipath"]["mock"] = False
+    rpa.IDEMPOTENCY = rpa.IdempotencyIndex(db_path=str(tmp_path / "idem.db"))
+
+    rpa.trigger_uipath_bot("CreateServiceJob", {"customer": 1})
+    rpa.trigger_uipath_bot("CreateServiceJob", {"customer": 1})
+    rpa.trigger_uipath_bot("CreateServiceJob", {"customer": 2})
+
+    assert uipath_calls == [("CreateServiceJob", {"customer": 1}), ("CreateServiceJob", {"customer": 2})]
+    assert rpa.IDEMPOTENCY.stats() == {"hits": 1, "misses": 2}
+
+
+def test_completed_keys_survive_restart(rpa, uipath_calls, tmp_path):
+    rpa.CONFIG["uipath"]["mock"] = False
+    rpa.IDEMPOTENCY = rpa.IdempotencyIndex(db_path=str(tmp_path / "idem.db"))
+    rpa.trigger_uipath_bot("CreateServiceJob", {"customer": 1})
+
+    rpa.IDEMPOTENCY = rpa.IdempotencyIndex(db_path=str(tmp_path / "idem.db"))
+    rpa.trigger_uipath_bot("CreateServiceJob", {"customer": 1})
+
+    assert len(uipath_calls) == 1
+
+
+def test_failed_job_is_retried(rpa, monkeypatch, tmp_path):
+    rpa.CONFIG["uipath"]["mock"] = False
+    rpa.IDEMPOTENCY = rpa.IdempotencyIndex(db_path=str(tmp_path / "idem.db"))
+    attempts = []
+
+    def flaky(bot, params):
+        attempts.append(bot)
+        if len(attempts) == 1:
+            raise Exception("Orchestrator 500")
+        return True
+
+    monkeypatch.setattr(rpa, "start_uipath_job", flaky)
+    flow = {"name": "F", "steps": [{"name": "job", "action": "uipath", "bot_name": "B", "params": {"customer": 1}}]}
+
+    assert rpa.execute_bpmn_flow(flow) is False
+    assert rpa.execute_bpmn_flow(flow) is True
+    assert attempts == ["B", "B"]
+
+
+def test_same_flow_definition_runs_again(rpa):
+    flow = {"name": "F", "steps": [{"name": "bad", "action": "python", "module": "no_such_module"}]}
+
+    assert rpa.execute_bpmn_flow(flow) is False
+    assert rpa.execute_bpmn_flow(flow) is False
+
+
+def test_mock_mode_does_not_record_jobs(rpa, uipath_calls, tmp_path):
+    rpa.IDEMPOTENCY = rpa.IdempotencyIndex(db_path=str(tmp_path / "idem.db"))
+    rpa.trigger_uipath_bot("B", {"customer": 1})
+
+    rpa.CONFIG["uipath"]["mock"] = False
+    rpa.trigger_uipath_bot("B", {"customer": 1})
+
+    assert len(uipath_calls) == 2
+
+
+def test_index_is_not_created_on_import(rpa, tmp_path):
+    assert rpa.IDEMPOTENCY is None
+    assert not (tmp_path / "idempotency.db").exists()
+
+
+def _parallel_duplicates_flow():
+    return {"name": "F", "subflows": {"Job": {"steps": [{"name": "job", "action": "uipath", "bot_name": "B"}]}},
+            "steps": [{"name": "each", "action": "foreach", "items": [1, 1], "item_param": "customer",
+                       "subflow": "Job", "parallel": 2}]}
+
+
+def test_parallel_duplicate_waits_and_is_skipped_after_success(rpa, monkeypatch, tmp_path):
+    rpa.CONFIG["uipath"]["mock"] = False
+    rpa.IDEMPOTENCY = rpa.IdempotencyIndex(db_path=str(tmp_path / "idem.db"))
+    attempts = []
+
+    def slow(bot, params):
+        attempts.append(params)
+        time.sleep(0.2)
+        return True
+
+    monkeypatch.setattr(rpa, "start_uipath_job", slow)
+
+    assert rpa.execute_bpmn_flow(_parallel_duplicates_flow()) is True
+    assert attempts == [{"customer": 1}]
+    assert rpa.IDEMPOTENCY.stats() == {"hits": 1, "misses": 1}
+
+
+def test_parallel_duplicate_runs_when_first_attempt_fails(rpa, monkeypatch, tmp_path):
+    rpa.CONFIG["uipath"]["mock"] = False
+    rpa.IDEMPOTENCY = rpa.IdempotencyIndex(db_path=str(tmp_path / "idem.db"))
+    attempts = []
+
+    def fail_first(bot, params):
+        attempts.append(params)
+        time.sleep(0.2)
+        if len(attempts) == 1:
+            raise Exception("Orchestrator 500")
+        return True
+
+    monkeypatch.setattr(rpa, "start_uipath_job", fail_first)
+
+    assert rpa.execute_bpmn_flow(_parallel_duplicates_flow()) is False
+    assert attempts == [{"customer": 1}, {"customer": 1}]
+    assert rpa.IDEMPOTENCY.stats() == {"hits": 0, "misses": 2}
@@ -0,0 +1,52 @@
+import logging
+
+
+class FailingCursor:
+    def execute(self, query, params=()):
+        raise Exception("Invalid column name 'RunId'")
+
+
+class RecordingCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, query, params=()):
+        self.rows.append((query, params))
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.closed = False
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_missing_log_columns_do_not_stop_the_flow(rpa, uipath_calls, monkeypatch):
+    conn = FakeConnection(FailingCursor())
+    monkeypatch.setattr(rpa, "get_sql_connection", lambda: conn)
+    flow = {"name": "F", "steps": [{"name": "job", "action": "uipath", "bot_name": "B"}]}
+
+    assert rpa.execute_bpmn_flow(flow) is True
+    assert uipath_calls == [("B", {})]
+    assert conn.closed
+
+
+def test_failed_step_writes_duration_once_and_routes_error(rpa, monkeypatch):
+    rows = []
+    monkeypatch.setattr(rpa, "get_sql_connection", lambda: FakeConnection(RecordingCursor(rows)))
+    flow = {"name": "F", "steps": [{"name": "bad", "action": "python", "module": "no_such_module"}]}
+
+    assert rpa.execute_bpmn_flow(flow) is False
+
+    step_rows = [p for q, p in rows if q.startswith("INSERT INTO dbo.Logs") and p[5] == "bad"]
+    assert [p[0] for p in step_rows if p[6] is not None] == [logging.INFO]
+    errors = [p for q, p in rows if q.startswith("INSERT INTO dbo.ErrorLogs")]
+    assert len(errors) == 1 and errors[0][0] == "F" and errors[0][4] == "bad"